@@ -0,0 +1,49 @@
+"""add vehicle partial index, drop superseded indexes
+
+Revision ID: a7c5590de413
+Revises: f3b81d20c6aa
+Create Date: 2026-08-28 13:21:17.902446
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c5590de413'
+down_revision: Union[str, None] = 'f3b81d20c6aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_violations_vehicle_plate_updated_at', 'violations',
+                        ['entity_reference', 'updated_at'],
+                        unique=False, postgresql_where=sa.text("category = 'vehicle'"),
+                        postgresql_concurrently=True)
+        # The partial index serves the only query that filters on
+        # entity_reference, so the full three-column composite is now pure
+        # write amplification on every violation insert/update
+        op.drop_index('ix_violations_category_entity_updated_at', table_name='violations',
+                      postgresql_concurrently=True)
+        # No query filters on the raw lat/lon columns; spatial lookups go
+        # through the geography/geometry indexes instead
+        op.drop_index('ix_violations_latitude', table_name='violations',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_violations_longitude', table_name='violations',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_violations_longitude', 'violations', ['longitude'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_violations_latitude', 'violations', ['latitude'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_violations_category_entity_updated_at', 'violations',
+                        ['category', 'entity_reference', 'updated_at'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_violations_vehicle_plate_updated_at', table_name='violations',
+                      postgresql_concurrently=True)
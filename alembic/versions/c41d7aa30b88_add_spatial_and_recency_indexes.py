@@ -0,0 +1,43 @@
+"""add spatial and recency indexes
+
+Revision ID: c41d7aa30b88
+Revises: bf1822f59a46
+Create Date: 2026-08-28 10:14:52.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7aa30b88'
+down_revision: Union[str, None] = 'bf1822f59a46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking writes on the live tables; it needs to run
+    # outside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_violations_location_spgist', 'violations', ['location'],
+                        unique=False, postgresql_using='spgist', postgresql_concurrently=True)
+        # SP-GiST replaces the baseline GiST index on location; keeping both
+        # would double spatial index maintenance on every violation write and
+        # leave the planner free to keep picking the old one
+        op.drop_index('idx_violations_location', table_name='violations',
+                      postgresql_concurrently=True)
+        op.create_index('ix_violations_category_updated_at', 'violations', ['category', 'updated_at'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_wards_geom_spgist', 'wards', ['geom'],
+                        unique=False, postgresql_using='spgist', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_wards_geom_spgist', table_name='wards', postgresql_concurrently=True)
+        op.drop_index('ix_violations_category_updated_at', table_name='violations', postgresql_concurrently=True)
+        op.create_index('idx_violations_location', 'violations', ['location'],
+                        unique=False, postgresql_using='gist', postgresql_concurrently=True)
+        op.drop_index('ix_violations_location_spgist', table_name='violations', postgresql_concurrently=True)
@@ -0,0 +1,50 @@
+"""add planar ward geometry column
+
+Revision ID: e9427cf51f02
+Revises: c41d7aa30b88
+Create Date: 2026-08-28 11:37:09.664281
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9427cf51f02'
+down_revision: Union[str, None] = 'c41d7aa30b88'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('wards', sa.Column(
+        'geom_planar',
+        geoalchemy2.types.Geometry(geometry_type='POLYGON', srid=4326, spatial_index=False),
+        nullable=True,
+    ))
+    # Backfill existing wards and keep the shadow column in sync on writes
+    op.execute("UPDATE wards SET geom_planar = geom::geometry")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION wards_sync_geom_planar() RETURNS trigger AS $$
+        BEGIN
+            NEW.geom_planar := NEW.geom::geometry;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_wards_sync_geom_planar
+        BEFORE INSERT OR UPDATE OF geom ON wards
+        FOR EACH ROW EXECUTE FUNCTION wards_sync_geom_planar()
+    """)
+    op.create_index('ix_wards_geom_planar', 'wards', ['geom_planar'],
+                    unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_wards_geom_planar', table_name='wards')
+    op.execute("DROP TRIGGER IF EXISTS trg_wards_sync_geom_planar ON wards")
+    op.execute("DROP FUNCTION IF EXISTS wards_sync_geom_planar()")
+    op.drop_column('wards', 'geom_planar')
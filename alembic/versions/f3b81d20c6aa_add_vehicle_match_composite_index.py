@@ -0,0 +1,35 @@
+"""add vehicle match composite index
+
+Revision ID: f3b81d20c6aa
+Revises: e9427cf51f02
+Create Date: 2026-08-28 12:02:41.557310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b81d20c6aa'
+down_revision: Union[str, None] = 'e9427cf51f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_violations_category_entity_updated_at', 'violations',
+                        ['category', 'entity_reference', 'updated_at'],
+                        unique=False, postgresql_concurrently=True)
+        # Redundant now that both composites lead with category
+        op.drop_index('ix_violations_category', table_name='violations',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_violations_category', 'violations', ['category'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_violations_category_entity_updated_at', table_name='violations',
+                      postgresql_concurrently=True)
@@ -1,36 +1,99 @@
+import hashlib
 import logging
+import threading
+import time
+
+import jwt
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import User
-from app.services.media import supabase
+from app.services.media import get_supabase
 
 # This tells FastAPI to look for the "Authorization: Bearer <token>" header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/verify-otp/")
 
+# Cache of already-validated tokens so repeated requests within the TTL skip the
+# blocking Supabase HTTP round-trip. Keyed by SHA-256 of the raw token and storing
+# (email, jwt_exp); entries are re-checked against the token's own expiry on read
+# so a cached token never outlives its JWT.
+TOKEN_CACHE_TTL_SECONDS = 30
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+_token_cache_lock = threading.Lock()
+
+# Cache of resolved local User rows keyed by email, so warm repeat callers
+# skip the per-request SELECT too. Instances are expunged from their session
+# before caching, making them plain detached objects that are safe to share;
+# the upload path keeps total_points in sync from its RETURNING update, the
+# profile endpoint reads points fresh from the DB, and admin-gated endpoints
+# must re-check is_admin against the DB rather than trust the cached copy.
+USER_CACHE_TTL_SECONDS = 300
+_user_cache: TTLCache = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_lock = threading.Lock()
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _token_expiry(token: str):
+    """Best-effort read of the JWT 'exp' claim (Supabase already verified the signature)."""
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+        return claims.get("exp")
+    except Exception:
+        return None
+
+def invalidate_token(token: str) -> None:
+    """Drops a token from the validation cache (e.g. on logout)."""
+    with _token_cache_lock:
+        _token_cache.pop(_token_cache_key(token), None)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     """
     Validates the JWT token with Supabase and returns the matching local database user.
     """
-    try:
-        # Ask Supabase if this token is cryptographically valid and not expired
-        auth_response = supabase.auth.get_user(token)
-        if not auth_response or not auth_response.user or not auth_response.user.email:
-            raise ValueError("Invalid or expired token")
-        
-        user_email = auth_response.user.email
-    except Exception as e:
-        logging.error(f"Token validation failed: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials. Please log in again.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    cache_key = _token_cache_key(token)
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+
+    user_email = None
+    if cached:
+        email, exp = cached
+        if exp is None or exp > time.time():
+            user_email = email
+
+    if user_email is None:
+        try:
+            # Ask Supabase if this token is cryptographically valid and not expired
+            auth_response = get_supabase().auth.get_user(token)
+            if not auth_response or not auth_response.user or not auth_response.user.email:
+                raise ValueError("Invalid or expired token")
+
+            user_email = auth_response.user.email
+        except Exception as e:
+            logging.error(f"Token validation failed: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials. Please log in again.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        with _token_cache_lock:
+            _token_cache[cache_key] = (user_email, _token_expiry(token))
+
+    with _user_cache_lock:
+        user = _user_cache.get(user_email)
+    if user is not None:
+        return user
 
     # Fetch our local database user profile securely
-    user = db.query(User).filter(User.email == user_email).first()
+    user = db.scalars(select(User).where(User.email == user_email)).first()
     if not user:
         raise HTTPException(status_code=404, detail="User account not found in database.")
-    
-    return user
\ No newline at end of file
+
+    db.expunge(user)
+    with _user_cache_lock:
+        _user_cache[user_email] = user
+
+    return user
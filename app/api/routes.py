@@ -5,10 +5,11 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 from pydantic import BaseModel
 
-from fastapi import APIRouter, File, UploadFile, Form, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, File, UploadFile, Form, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast
-from geoalchemy2.elements import WKTElement
+from sqlalchemy import func, cast, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from geoalchemy2 import Geography
 from pydantic import EmailStr
 
@@ -20,6 +21,11 @@ from app.core.config import settings
 from app.services.media import detect_image_type_from_bytes, upload_image_to_storage
 
 from disposable_email_domains import blocklist
+
+# Freeze the burner-domain list once at import time: hashed O(1) lookups per
+# request instead of scanning the upstream container, and lowercased to match
+# our normalized domains.
+BURNER_DOMAINS = frozenset(domain.lower() for domain in blocklist)
 # Change schemas import to include the new models
 from app.schemas.schemas import CategoryEnum, ReportResponse, OTPRequest, VerifyOTPRequest, AuthResponse
 # Add the auth service import
@@ -33,6 +39,16 @@ from app.services.geo import calculate_distance_meters # Use geopy or similar
 
 ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/jpg"}
 
+# Hot settings hoisted once at import time: plain module-level constants in the
+# request path instead of Pydantic attribute lookups, and the recency window
+# becomes a prebuilt timedelta rather than one constructed per request.
+MAX_UPLOAD_SIZE_BYTES = settings.MAX_UPLOAD_SIZE_BYTES
+NEARBY_METERS = settings.NEARBY_METERS
+RECENT_WINDOW = timedelta(hours=settings.RECENT_HOURS)
+MAX_DAILY_REPORTS = settings.MAX_DAILY_REPORTS
+REWARD_NEW_VIOLATION = settings.REWARD_NEW_VIOLATION
+REWARD_CONFIRMED_VIOLATION = settings.REWARD_CONFIRMED_VIOLATION
+
 
 
 router = APIRouter()
@@ -40,7 +56,7 @@ router = APIRouter()
 def verify_not_burner(email: str):
     """Fails fast with a 422 if the email domain is a known burner."""
     domain = email.split('@')[-1].lower()
-    if domain in blocklist:
+    if domain in BURNER_DOMAINS:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, 
             detail="Disposable/temporary email addresses are strictly prohibited."
@@ -57,38 +73,58 @@ async def login_user(email: EmailStr = Form(...), db: Session = Depends(get_db))
         db.refresh(user)
     return {"user_id": user.id, "email": user.email, "total_points": user.total_points}"""
 
-@router.post("/auth/send-otp/")
-async def request_otp(payload: OTPRequest):
-    """Step 1: Validate email, block burners, and send the OTP."""
+@router.post("/auth/send-otp/", status_code=status.HTTP_202_ACCEPTED)
+async def request_otp(payload: OTPRequest, background_tasks: BackgroundTasks):
+    """Step 1: Validate email, block burners, and queue the OTP send."""
     verify_not_burner(payload.email)
-    
-    try:
-        send_otp_email(payload.email)
-        return {"message": "OTP sent successfully. Please check your email."}
-    except RuntimeError as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
+    # The client only needs "check your email" — don't make it wait out the
+    # Supabase/SMTP round trip. Failures are logged inside send_otp_email.
+    background_tasks.add_task(send_otp_email, payload.email)
+    return {"message": "OTP sent successfully. Please check your email."}
+
+
+def _upsert_user_by_email(db: Session, email: str) -> User:
+    """Get-or-create a user in one round trip via INSERT .. ON CONFLICT (email)
+    DO UPDATE .. RETURNING. The no-op DO UPDATE makes RETURNING yield the
+    existing row on conflict, so two concurrent first logins can no longer race
+    into a unique-constraint 500. SQLite (used by the test suite) shares the
+    same ON CONFLICT syntax via its own insert construct."""
+    insert_fn = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+    stmt = (
+        insert_fn(User)
+        .values(email=email, is_admin=False)
+        .on_conflict_do_update(index_elements=[User.email], set_={"email": email})
+        .returning(User)
+    )
+    user = db.execute(stmt).scalar_one()
+    # Detach before committing: expire_on_commit would otherwise blank the
+    # instance and the caller's attribute reads would re-SELECT the row,
+    # quietly re-adding the round trip this upsert exists to remove. RETURNING
+    # already populated every column.
+    db.expunge(user)
+    db.commit()
+    return user
 
 @router.post("/auth/verify-otp/", response_model=AuthResponse)
-async def verify_otp(payload: VerifyOTPRequest, db: Session = Depends(get_db)):
+def verify_otp(payload: VerifyOTPRequest, db: Session = Depends(get_db)):
     """Step 2: Verify the 6-digit code, sync user to local DB, and return JWT."""
     verify_not_burner(payload.email)
-    
+
+    # Whether this email already exists locally tells us which OTP type
+    # Supabase issued, so verify_otp_code can try the right one first
+    is_new_user = db.execute(select(User.id).where(User.email == payload.email)).first() is None
+
     try:
         # This will raise ValueError if the OTP is wrong
-        access_token = verify_otp_code(payload.email, payload.otp)
+        access_token = verify_otp_code(payload.email, payload.otp, is_new_user=is_new_user)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
     # Sync the Supabase Auth user to our local PostgreSQL database
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user:
-        user = User(email=payload.email, is_admin=False)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    user = _upsert_user_by_email(db, payload.email)
     # 🛑 THE FIX: Safely check if they are an admin in the database
     # (Using getattr prevents crashes if you haven't run your DB migrations yet)
     user_is_admin = getattr(user, "is_admin", False)
@@ -103,7 +139,7 @@ async def verify_otp(payload: VerifyOTPRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/upload-report/", response_model=ReportResponse)
-async def upload_report(
+def upload_report(
     latitude: float = Form(..., ge=-90.0, le=90.0),
     longitude: float = Form(..., ge=-180.0, le=180.0),
     category: CategoryEnum = Form(CategoryEnum.shop),
@@ -114,34 +150,53 @@ async def upload_report(
 ):
     logging.info("Received upload content-type: %s", image.content_type)
 
-    file_bytes = await image.read()
-    detected_type = None
-    if image.content_type not in ALLOWED_CONTENT_TYPES:
-        detected = detect_image_type_from_bytes(file_bytes)
+    # Starlette has already spooled the part by handler time, so when it knows
+    # the size we can refuse oversize bodies before copying a single byte
+    if image.size and image.size > MAX_UPLOAD_SIZE_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Image too large")
+
+    # Read in 64 KiB chunks so an oversize body is rejected the instant it
+    # crosses the limit instead of after buffering all of it in RAM.
+    buf = bytearray()
+    while chunk := image.file.read(64 * 1024):
+        buf += chunk
+        if len(buf) > MAX_UPLOAD_SIZE_BYTES:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Image too large")
+    file_bytes = bytes(buf)
+
+    # Probe the allowed set once; only fall back to sniffing when the declared
+    # content type isn't trusted, and then only hand the sniffer the first few
+    # bytes — the magic numbers never live deeper than that.
+    is_allowed = image.content_type in ALLOWED_CONTENT_TYPES
+    effective_content_type = image.content_type if is_allowed else None
+    if not is_allowed:
+        detected = detect_image_type_from_bytes(file_bytes[:16])
         if detected in ("jpeg", "png"):
-            detected_type = f"image/{detected}"
+            effective_content_type = f"image/{detected}"
 
-    effective_content_type = image.content_type if image.content_type in ALLOWED_CONTENT_TYPES else detected_type
     if not effective_content_type:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported image type: {image.content_type}")
 
-    if len(file_bytes) > settings.MAX_UPLOAD_SIZE_BYTES:
-        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Image too large")
-    
+    # One clock reading per request; every window and inserted timestamp below
+    # derives from it instead of re-allocating tz-aware datetimes
+    now = datetime.now(timezone.utc)
+
     # --- 🛑 THE 24-HOUR DAILY LIMIT CHECK 🛑 ---
     #MAX_DAILY_REPORTS = 5
     # 2. The 24-Hour Daily Limit check
-    twenty_four_hours_ago = datetime.now(timezone.utc) - timedelta(hours=24)
+    twenty_four_hours_ago = now - timedelta(hours=24)
     
-    recent_reports_count = db.query(Report).filter(
-        Report.user_id == current_user.id,
-        Report.timestamp >= twenty_four_hours_ago
-    ).count()
+    recent_reports_count = db.scalar(
+        select(func.count()).select_from(Report).where(
+            Report.user_id == current_user.id,
+            Report.timestamp >= twenty_four_hours_ago,
+        )
+    )
 
-    if recent_reports_count >= settings.MAX_DAILY_REPORTS:
+    if recent_reports_count >= MAX_DAILY_REPORTS:
         raise HTTPException(
             status_code=429,
-            detail=f"Daily limit reached! You have already submitted {settings.MAX_DAILY_REPORTS} reports in the last 24 hours. Thank you for your service!"
+            detail=f"Daily limit reached! You have already submitted {MAX_DAILY_REPORTS} reports in the last 24 hours. Thank you for your service!"
         )
     # ---------------------------------------------
     
@@ -156,71 +211,143 @@ async def upload_report(
     # ------------------------------------------
 
     try:
-        # Upload happens exactly ONCE
-        public_image_url = upload_image_to_storage(file_bytes, image.filename, effective_content_type)
-    except RuntimeError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-    try:
-        matched_violation = None
-        
-        # Create PostGIS point for the upload location
-        target_point = WKTElement(f"POINT({longitude} {latitude})", srid=4326)
-        
-        # Ask PostGIS which Ward polygon contains this GPS point
-        containing_ward = db.query(Ward).filter(func.ST_Intersects(Ward.geom, cast(target_point, Geography))).first()
-
-        # Check if this violation already exists
-        if category == CategoryEnum.vehicle and license_plate:
-            twenty_four_hours_ago = datetime.now(timezone.utc) - timedelta(hours=settings.RECENT_HOURS)
-            matched_violation = db.query(Violation).filter(
-                Violation.category == "vehicle",
-                Violation.entity_reference == license_plate.upper(),
-                Violation.updated_at >= twenty_four_hours_ago,
-            ).first()
+        matched_violation_id = None
+
+        # Canonical plate form, computed once so the lookup filter and the
+        # insert below always agree on it
+        plate = license_plate.upper() if license_plate else None
+
+        # Create the PostGIS point for the upload location. ST_MakePoint binds
+        # the coordinates as two plain floats — no f-string formatting here and
+        # no WKT parsing server-side. The geography cast serves the columns and
+        # predicates that operate in geography space.
+        target_point = func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)
+        target_point_geog = cast(target_point, Geography)
+
+        # Check if this violation already exists. The recency cutoff is shared
+        # by the vehicle and shop branches, so compute it exactly once.
+        recent_cutoff = now - RECENT_WINDOW
+        # Only the id of the matched row is ever used below (duplicate check,
+        # timestamp bump, report FK), so fetch just that scalar — no ORM
+        # instance construction — and push LIMIT 1 into the statement so the
+        # database stops at the first hit instead of materializing every
+        # candidate for .first() to discard.
+        if category == CategoryEnum.vehicle and plate:
+            matched_violation_id = db.scalar(
+                select(Violation.id).where(
+                    Violation.category == "vehicle",
+                    Violation.entity_reference == plate,
+                    Violation.updated_at >= recent_cutoff,
+                ).limit(1)
+            )
         else:
             # Check for existing structural violations within the bubble
-            query = db.query(Violation).filter(
+            stmt = select(Violation.id).where(
                 Violation.category == category.value,
-                func.ST_DWithin(Violation.location, target_point, settings.NEARBY_METERS)
+                func.ST_DWithin(Violation.location, target_point_geog, NEARBY_METERS)
             )
             if category == CategoryEnum.shop:
-                twenty_four_hours_ago = datetime.now(timezone.utc) - timedelta(hours=settings.RECENT_HOURS)
-                query = query.filter(Violation.updated_at >= twenty_four_hours_ago)
-            matched_violation = query.first()
+                stmt = stmt.where(Violation.updated_at >= recent_cutoff)
+            # Take the closest candidate, not an arbitrary one, when several
+            # violations fall inside the bubble
+            matched_violation_id = db.scalar(
+                stmt.order_by(func.ST_Distance(Violation.location, target_point_geog)).limit(1)
+            )
+
+        if matched_violation_id is not None:
+            # The same reporter re-confirming the same violation within the
+            # window adds no new evidence — bail out before paying for the
+            # storage upload, and award nothing.
+            already_reported = db.execute(
+                select(Report.id).where(
+                    Report.violation_id == matched_violation_id,
+                    Report.user_id == current_user.id,
+                    Report.timestamp >= recent_cutoff,
+                )
+            ).first()
+            if already_reported:
+                return {
+                    "message": "You have already confirmed this violation recently. No additional points awarded.",
+                    "reward_points": 0,
+                    "total_points": current_user.total_points,
+                }
+
+        # Upload happens exactly ONCE, and only now that we know the report
+        # will actually be recorded
+        try:
+            public_image_url = upload_image_to_storage(file_bytes, image.filename, effective_content_type)
+        except RuntimeError as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
         # Handle the logic cleanly (Update vs Create)
-        if matched_violation:
-            setattr(matched_violation, "updated_at", datetime.now(timezone.utc))
-            new_report = Report(violation_id=matched_violation.id, user_id=current_user.id, image_path=public_image_url)
-            points_earned = settings.REWARD_CONFIRMED_VIOLATION
+        if matched_violation_id is not None:
+            # DB-authoritative timestamp bump; skips the tz-aware datetime
+            # allocation and the ORM attribute-history machinery
+            db.execute(
+                update(Violation)
+                .where(Violation.id == matched_violation_id)
+                .values(updated_at=func.now())
+            )
+            new_report = Report(violation_id=matched_violation_id, user_id=current_user.id,
+                                image_path=public_image_url, timestamp=now)
+            points_earned = REWARD_CONFIRMED_VIOLATION
             message = f"Violation Confirmed! +{points_earned} Points."
         else:
+            # Ask PostGIS which Ward polygon contains this GPS point — only the
+            # first-reporter path tags a ward, so confirmations skip this query
+            # entirely. The && bbox operator prunes to index-candidate wards
+            # first; the exact containment check (ST_Covers is cheaper than
+            # ST_Intersects for a point) then only runs on those few
+            # candidates, against the planar geom_planar shadow column.
+            containing_ward = db.scalars(
+                select(Ward).where(
+                    Ward.geom_planar.op('&&')(target_point),
+                    func.ST_Covers(Ward.geom_planar, target_point),
+                )
+            ).first()
+
             new_violation = Violation(
                 latitude=latitude,
                 longitude=longitude,
                 category=category.value,
-                entity_reference=license_plate.upper() if license_plate else None,
-                location=target_point,
-                ward_id=containing_ward.id if containing_ward else None # Tags the ward dynamically!
+                entity_reference=plate,
+                location=target_point_geog,
+                ward_id=containing_ward.id if containing_ward else None, # Tags the ward dynamically!
+                created_at=now,
+                updated_at=now,
             )
             db.add(new_violation)
-            db.commit()
-            db.refresh(new_violation)
+            # Flush (not commit) so the violation gets its id while keeping the
+            # report + points update in the same transaction below.
+            db.flush()
 
-            new_report = Report(violation_id=new_violation.id, user_id=current_user.id, image_path=public_image_url)
-            points_earned = settings.REWARD_NEW_VIOLATION
+            new_report = Report(violation_id=new_violation.id, user_id=current_user.id,
+                                image_path=public_image_url, timestamp=now)
+            points_earned = REWARD_NEW_VIOLATION
             message = f"First Reporter! New Violation Secured. +{points_earned} Points."
         
-        setattr(current_user, "total_points", getattr(current_user, "total_points") + points_earned)
         db.add(new_report)
+        # Server-side increment: atomic under concurrent reports for the same
+        # user (no read-modify-write race) and RETURNING hands back the fresh
+        # total without another SELECT
+        new_total = db.scalar(
+            update(User)
+            .where(User.id == current_user.id)
+            .values(total_points=User.total_points + points_earned)
+            .returning(User.total_points)
+        )
         db.commit()
 
+        # Keep the (possibly cached, detached) user object in step with the DB
+        current_user.total_points = new_total
+
         return {
             "message": message,
             "reward_points": points_earned,
-            "total_points": current_user.total_points,
+            "total_points": new_total,
         }
+    except HTTPException:
+        raise
     except Exception:
         logging.exception("Error while processing report; rolling back DB transaction")
         db.rollback()
@@ -235,19 +362,22 @@ class LeaderboardEntry(BaseModel):
 @router.get("/leaderboard/", response_model=List[LeaderboardEntry])
 def get_leaderboard(db: Session = Depends(get_db)):
     """Fetches the top 10 heroes in Ward 118."""
-    top_users = db.query(User).order_by(User.total_points.desc()).limit(10).all()
-    
+    # Only the two scalar columns are needed — skip full ORM row construction
+    top_users = db.execute(
+        select(User.email, User.total_points).order_by(User.total_points.desc()).limit(10)
+    ).all()
+
     leaderboard = []
-    for user in top_users:
-        parts = user.email.split('@')
+    for email, total_points in top_users:
+        parts = email.split('@')
         if len(parts) == 2:
             name_part = parts[0][:3] + "***" if len(parts[0]) > 3 else parts[0] + "***"
             masked = f"{name_part}@{parts[1]}"
         else:
             masked = "Unknown Hero"
-            
-        leaderboard.append(LeaderboardEntry(email_masked=masked, total_points=user.total_points))
-        
+
+        leaderboard.append(LeaderboardEntry(email_masked=masked, total_points=total_points))
+
     return leaderboard
 
 class MapPoint(BaseModel):
@@ -258,51 +388,69 @@ class MapPoint(BaseModel):
 @router.get("/admin/map-data/", response_model=List[MapPoint])
 def get_map_data(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
     """Fetches all violation points for the heatmap."""
-    # 🛑 2. SECURITY CHECK: Ensure the database says they are an admin
-    if not getattr(current_user, 'is_admin', False):
+    # 🛑 2. SECURITY CHECK: Ensure the database says they are an admin.
+    # current_user may come from the auth layer's 5-minute cache, and admin
+    # revocation must bite immediately — so re-read the flag from the DB here.
+    # One indexed SELECT on an admin-only endpoint is negligible, and a row
+    # that has been deleted since caching comes back None → 403.
+    is_admin = db.scalar(select(User.is_admin).where(User.id == current_user.id))
+    if not is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
 
             detail="Access Denied: You do not have admin privileges."
         )
     
-    violations = db.query(Violation).all()
-    
+    # We can just read the standard float columns we created in Phase 1 —
+    # no need to pull the geography column or build ORM instances
+    violations = db.execute(
+        select(Violation.latitude, Violation.longitude, Violation.category)
+    ).all()
+
     map_points = []
-    for v in violations:
-        # We can just read the standard float columns we created in Phase 1!
+    for lat, lng, category in violations:
         map_points.append(MapPoint(
-            lat=v.latitude, 
-            lng=v.longitude, 
-            category=v.category
+            lat=lat,
+            lng=lng,
+            category=category
         ))
-        
+
     return map_points
 
 @router.get("/profile/", response_model=MyProfileResponse)
 def get_user_profile(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Fetches the user's stats and their entire report history."""
     
-    # Fetch all reports belonging to this specific user, newest first
-    reports = db.query(Report).filter(Report.user_id == current_user.id).order_by(Report.timestamp.desc()).all()
-    
+    # Fetch all reports belonging to this specific user, newest first.
+    # Joining the violation category in avoids one lazy-load query per report.
+    reports = db.execute(
+        select(Report.id, Report.timestamp, Report.image_path, Violation.category)
+        .outerjoin(Violation, Report.violation_id == Violation.id)
+        .where(Report.user_id == current_user.id)
+        .order_by(Report.timestamp.desc())
+    ).all()
+
     report_list = []
-    for r in reports:
+    for report_id, timestamp, image_url, category in reports:
         # Get the category from the linked violation
-        cat = r.violation.category if r.violation else "Unknown"
-        
+        cat = category if category else "Unknown"
+
         report_list.append({
-            "id": r.id,
+            "id": report_id,
             "category": cat.capitalize(),
-            "timestamp": r.timestamp,
-            "image_url": r.image_path,
+            "timestamp": timestamp,
+            "image_url": image_url,
             # MVP Hack: Since we don't have a database column for status yet, we mock it.
             # In Version 2, the Admin Map will have a button to change this to "Resolved"!
             "status": "Pending BMC" 
         })
         
+    # Read the points fresh — current_user may be a cached copy up to the
+    # auth-cache TTL old
+    total_points = db.scalar(select(User.total_points).where(User.id == current_user.id))
+
     return {
         "email": current_user.email,
-        "total_points": current_user.total_points,
+        "total_points": total_points,
         "reports": report_list
     }
\ No newline at end of file
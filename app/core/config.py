@@ -13,6 +13,10 @@ class Settings(BaseSettings):
     RECENT_HOURS: int = 24
     AUTO_CREATE_TABLES: bool = False
 
+    # --- DB connection pool sizing (overridable per deployment) ---
+    POOL_SIZE: int = 20
+    POOL_MAX_OVERFLOW: int = 10
+
     # --- NEW: Anti-Spam & Security Configuration ---
     MAX_DAILY_REPORTS: int = 10
     #ALLOWED_CONTENT_TYPES: str = "image/jpeg,image/png,image/jpg"
@@ -2,7 +2,20 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+# Sized for bursts of /upload-report/ traffic: warm pooled connections instead
+# of a fresh TCP+TLS handshake per request. pre_ping drops dead connections
+# before a request trips over them; recycle stays under typical server-side
+# idle timeouts.
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.POOL_SIZE,
+    max_overflow=settings.POOL_MAX_OVERFLOW,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    # Roomy compiled-statement cache so the per-request statements always hit
+    query_cache_size=1200,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -1,38 +1,49 @@
 import logging
 from typing import cast, Any
 from app.core.config import settings
-from app.services.media import supabase
+from app.services.media import get_supabase
 
 def send_otp_email(email: str) -> None:
     """Requests Supabase to send a 6-digit OTP to the user's email."""
     try:
         # Cast to Any to satisfy Pylance's strict TypedDict requirements
         payload = cast(Any, {"email": email})
-        supabase.auth.sign_in_with_otp(payload)
+        get_supabase().auth.sign_in_with_otp(payload)
     except Exception as e:
         logging.error(f"Supabase Auth Error (send_otp): {str(e)}")
         raise RuntimeError("Failed to send OTP.")
 
-def verify_otp_code(email: str, otp: str) -> str:
+# Error codes that mean the request itself is bad (rate limited, malformed),
+# not that we guessed the wrong OTP type — retrying other types can't help.
+_NON_RETRYABLE_AUTH_CODES = {"over_request_rate_limit", "over_email_send_rate_limit", "validation_failed"}
+
+def verify_otp_code(email: str, otp: str, is_new_user: bool = False) -> str:
     """
-    Verifies the OTP with Supabase. 
+    Verifies the OTP with Supabase.
     Returns the JWT access token if successful.
+
+    Supabase tags the OTP by how it was issued: first-time addresses get a
+    "signup" token, returning ones an "email" token. Trying the expected type
+    first makes the common path a single HTTPS round trip instead of up to
+    three; the remaining types are only fallbacks for SDK/account-age quirks.
     """
     last_error = None
-    
-    # Supabase OTP types change depending on account age and SDK versions.
-    # We loop through all valid types to guarantee a successful login.
-    for otp_type in ["email", "signup", "magiclink"]:
+
+    otp_types = ["signup", "email", "magiclink"] if is_new_user else ["email", "signup", "magiclink"]
+    for otp_type in otp_types:
         try:
             # Cast to Any to satisfy Pylance's strict TypedDict requirements
             payload = cast(Any, {"email": email, "token": otp, "type": otp_type})
-            res = supabase.auth.verify_otp(payload)
-            
+            res = get_supabase().auth.verify_otp(payload)
+
             if res.session and res.session.access_token:
                 return res.session.access_token
         except Exception as e:
-            # Capture the error but continue to the next type
+            # Capture the error but continue to the next type, unless the
+            # error says no other type could possibly succeed
             last_error = e
+            if getattr(e, "code", None) in _NON_RETRYABLE_AUTH_CODES:
+                break
 
     # If we exhausted all types and none worked, the OTP is truly invalid
     logging.error(f"Supabase Auth Error (verify_otp exhausted): {str(last_error)}")
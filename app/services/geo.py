@@ -1,10 +1,18 @@
 import math
 
-def calculate_distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    R = 6371000
-    phi_1, phi_2 = math.radians(lat1), math.radians(lat2)
+EARTH_RADIUS_METERS = 6371000
+
+def _haversine_from_anchor(phi_1: float, cos_phi_1: float, lat1: float, lon1: float,
+                           lat2: float, lon2: float) -> float:
+    """Haversine with the anchor's radians/cosine precomputed by the caller —
+    saves two transcendental calls per candidate when looping from one anchor."""
+    phi_2 = math.radians(lat2)
     delta_phi = math.radians(lat2 - lat1)
     delta_lambda = math.radians(lon2 - lon1)
-    a = math.sin(delta_phi / 2.0) ** 2 + math.cos(phi_1) * math.cos(phi_2) * math.sin(delta_lambda / 2.0) ** 2
+    a = math.sin(delta_phi / 2.0) ** 2 + cos_phi_1 * math.cos(phi_2) * math.sin(delta_lambda / 2.0) ** 2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
\ No newline at end of file
+    return EARTH_RADIUS_METERS * c
+
+def calculate_distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi_1 = math.radians(lat1)
+    return _haversine_from_anchor(phi_1, math.cos(phi_1), lat1, lon1, lat2, lon2)
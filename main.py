@@ -1,7 +1,9 @@
 import logging
+import anyio
 from fastapi import FastAPI
 from app.api.routes import router
 from app.core.exceptions import global_exception_handler
+from app.services.media import close_http_client
 
 # Basic logging
 logging.basicConfig(level=logging.INFO)
@@ -13,4 +15,15 @@ app = FastAPI(title="FreeWalk Cloud API")
 app.add_exception_handler(Exception, global_exception_handler)
 
 # Register the routes from our Clean Architecture modules
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
+
+async def raise_threadpool_limit():
+    """The sync endpoints (DB + Supabase SDK work) all run in anyio's default
+    threadpool; its 40-token default caps concurrency below what the DB pool
+    and upload bursts can actually sustain."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 100
+
+app.add_event_handler("startup", raise_threadpool_limit)
+
+# Close the pooled Supabase HTTP connections cleanly on shutdown
+app.add_event_handler("shutdown", close_http_client)
\ No newline at end of file
@@ -30,11 +30,12 @@ def make_fake_supabase_module():
         def get_user(self, token):
             return SimpleNamespace(user=SimpleNamespace(email="tester@gmail.com"))
 
-    def create_client(url, key): 
+    def create_client(url, key, options=None):
         return SimpleNamespace(storage=Storage(), auth=FakeAuth())
-    
+
     mod.create_client = create_client
     mod.Client = SimpleNamespace
+    mod.ClientOptions = lambda **kwargs: SimpleNamespace(**kwargs)
     return mod
 
 sys.modules["supabase"] = make_fake_supabase_module()
@@ -82,7 +83,7 @@ def test_auth_and_upload(tmp_path):
     # --- Run Auth Tests ---
     # Note: We use a valid email domain to bypass our burner shield
     resp1 = client.post("/auth/send-otp/", json={"email": "tester@gmail.com"})
-    assert resp1.status_code == 200
+    assert resp1.status_code == 202
 
     resp2 = client.post("/auth/verify-otp/", json={"email": "tester@gmail.com", "otp": "123456"})
     assert resp2.status_code == 200